@@ -1,12 +1,32 @@
 from os import environ as env
 import csv
 import re
+from functools import partial
+from itertools import islice
+from math import isfinite
 from pathlib import Path
-from typing import List, Dict, Iterable, Optional, TypeAlias, Any
+from queue import Queue
+from threading import Thread
+from typing import (
+    List,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    TypeAlias,
+    Union,
+    Any,
+    Set,
+    Callable,
+    TypeVar,
+)
 
 from dotenv import load_dotenv
 from pymongo import MongoClient, ASCENDING, errors
+from pymongo.collection import Collection
+from pymongo.write_concern import WriteConcern
 from rich.console import Console  # Note: `rich` is installed as part of `typer[all]`
+from rich.markup import escape
 import typer
 
 # Create a `Console` instance, which I can use to print fancy messages to the console.
@@ -17,16 +37,41 @@ console = Console()
 # Reference: https://github.com/theskumar/python-dotenv#getting-started
 load_dotenv(verbose=True)
 
+# Type variable for functions that work with items of any type.
+T = TypeVar("T")
+
 # Type alias for a dictionary created from a row of a CSV file.
-RowDict: TypeAlias = Dict[str, Optional[str]]
+# Note: Data values are strings, unless the caller asks for them to be converted into floats.
+RowDict: TypeAlias = Dict[str, Union[str, float, None]]
 
 # Names of columns whose values this script will treat as "metadata" (as opposed to "data").
-METADATA_COLUMN_NAMES = ["Study_Code", "Sample_ID"]
+# Note: I use a `frozenset` (instead of a `list`) so that checking whether it contains a given
+#       column name takes constant time, regardless of how many names it contains.
+METADATA_COLUMN_NAMES = frozenset(("Study_Code", "Sample_ID"))
 
 
 # Regular expression this script can use to validate data extracted from data columns.
 # Note: Matches "1", "2.", "3.4", ".5", "0.67890", etc.; and does not match "." alone.
-VALID_DATA_REGEX = re.compile(r"^\d+\.?\d*$|^\.?\d+$")
+# Note: This script uses the `fullmatch` method (instead of `^` and `$` anchors) to require that
+#       the whole string match the pattern.
+#       Reference: https://docs.python.org/3/library/re.html#re.Pattern.fullmatch
+VALID_DATA_REGEX = re.compile(r"\d+(?:\.\d*)?|\.\d+")
+
+# The MongoDB client this script uses when the caller doesn't provide one (see `_get_default_client`).
+_default_client: Optional[MongoClient] = None
+
+# Size (in bytes) of the buffer this script will use when reading a CSV file.
+READ_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+# Error code the database uses to indicate that a write would violate a "unique" index.
+# Reference: https://www.mongodb.com/docs/manual/reference/error-codes/
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+# Maximum number of samples this script will insert into the database via a single request.
+BATCH_SIZE = 1000
+
+# Maximum number of parsed batches of samples that can be waiting to be stored in the database.
+MAX_QUEUED_BATCHES = 4
 
 
 def sanitize_metadata_value(raw_value: Optional[str]) -> Optional[str]:
@@ -60,61 +105,237 @@ def sanitize_data_value(raw_value: Optional[str]) -> Optional[str]:
     :param raw_value: The raw value you want to sanitize
     :return: The sanitized value
     """
-    if type(raw_value) is str:
+    if isinstance(raw_value, str):
         stripped_str = raw_value.strip()
-        return stripped_str if VALID_DATA_REGEX.match(stripped_str) else None
+        return stripped_str if VALID_DATA_REGEX.fullmatch(stripped_str) else None
     else:
         return None
 
 
-def parse_csv_file(file_path: Path) -> List[RowDict]:
+def _build_ragged_row_dict(column_names: List[str], row: List[str]) -> Dict[Any, Any]:
+    """
+    Builds a dictionary from a row whose length differs from that of the first row, the same way
+    `csv.DictReader` would (i.e. with its default `restkey` and `restval`, both of which are `None`).
+    Reference: https://docs.python.org/3/library/csv.html#csv.DictReader
+
+    :param column_names: The column names from the first row of the CSV file
+    :param row: The values from the row
+    :return: A dictionary whose keys are column names and whose values are raw values
+    """
+    row_dict: Dict[Any, Any] = dict(zip(column_names, row))
+    num_columns = len(column_names)
+    if len(row) > num_columns:
+        row_dict[None] = row[num_columns:]
+    else:
+        for column_name in column_names[len(row) :]:
+            row_dict[column_name] = None
+    return row_dict
+
+
+def _build_row_sanitizer(
+    column_names: List[str], data_values_as_floats: bool = False
+) -> Callable[[List[str]], RowDict]:
+    """
+    Builds a function that turns a row (whose length matches that of the first row) into a
+    sanitary dictionary, by generating—once per file—source code specialized for the columns.
+
+    For example, given the columns `Sample_ID` and `Percent_Clay`, the generated function is equivalent to:
+    ```
+    def sanitize_row(row):
+        return {
+            'Sample_ID': row[0].strip(),
+            'Percent_Clay': (value if match(value := row[1].strip()) else None),
+        }
+    ```
+
+    :param column_names: The column names from the first row of the CSV file
+    :param data_values_as_floats: Whether the function should convert (valid) data values into floats
+    :return: A function that takes a row's values and returns a sanitary dictionary
+    """
+    # Note: Generating the function this way means the per-row work is a flat sequence of
+    #       indexing, stripping, and matching; with no `zip`, and no per-cell check of whether a
+    #       column is a metadata column. The column names are embedded via `repr`, so they are
+    #       always valid string literals, regardless of what characters they contain.
+    #       Reference: https://docs.python.org/3/library/functions.html#exec
+    #
+    # Note: Values produced by `csv.reader` are always strings. Every value gets stripped of
+    #       leading/trailing whitespace; then, metadata values are kept as-is, and data values
+    #       are kept only if they match the regular expression (this is equivalent to the logic in
+    #       `sanitize_metadata_value` and `sanitize_data_value`).
+    #
+    # Note: Any string the regular expression matches is one `float` can convert (it consists
+    #       solely of digits and, at most, one decimal point); so, the conversion can't raise an
+    #       exception. The resulting float may be less precise than the string, though
+    #       (e.g. "9999999999.9999999999" → 10000000000.0); and, since the regular expression
+    #       accepts any number of digits, it may even be infinite (e.g. a string of 400 nines →
+    #       `inf`). I treat an infinite float as an invalid data value (i.e. I replace it with `None`).
+    #       Reference: https://docs.python.org/3/library/math.html#math.isfinite
+    #
+    if data_values_as_floats:
+        data_value_template = (
+            "(number if match(value := row[{index}].strip())"
+            " and isfinite(number := float(value)) else None)"
+        )
+    else:
+        data_value_template = (
+            "(value if match(value := row[{index}].strip()) else None)"
+        )
+    entries = []
+    for index, column_name in enumerate(column_names):
+        if column_name in METADATA_COLUMN_NAMES:
+            entries.append(f"{column_name!r}: row[{index}].strip()")
+        else:
+            entries.append(
+                f"{column_name!r}: {data_value_template.format(index=index)}"
+            )
+    source = "def sanitize_row(row):\n    return {" + ", ".join(entries) + "}\n"
+
+    namespace: Dict[str, Any] = {
+        "match": VALID_DATA_REGEX.fullmatch,
+        "isfinite": isfinite,
+    }
+    exec(compile(source, "<row sanitizer>", "exec"), namespace)
+    return namespace["sanitize_row"]
+
+
+def _split_into_batches(items: Iterable[T], batch_size: int) -> Iterator[List[T]]:
+    """
+    Splits the specified items into lists, yielding one list at a time.
+
+    :param items: The items you want to split (can be an iterator, which will be consumed lazily)
+    :param batch_size: Maximum number of items in each list
+    :return: Iterator of non-empty lists of items
+    """
+    iterator = iter(items)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def _iter_sanitary_rows(
+    file_path: Path, data_values_as_floats: bool = False
+) -> Iterator[RowDict]:
+    """
+    Parses the specified CSV file into sanitary dictionaries, yielding them one at a time.
+
+    :param file_path: Absolute path to CSV file
+    :param data_values_as_floats: Whether to convert (valid) data values into floats
+    :return: Iterator of dictionaries, each of which represents a row of data
+    """
+    # Note: I read the file through a larger buffer than the default one (which is typically 8 KiB),
+    #       so that reading a large file takes fewer system calls.
+    #       Reference: https://docs.python.org/3/library/functions.html#open
+    #
+    with open(file_path, newline="", buffering=READ_BUFFER_SIZE) as f:
+        reader = csv.reader(f)
+
+        # Use the values in the first row as column names; and, once for the whole file, build a
+        # function that sanitizes rows having those columns.
+        column_names: List[str] = next(reader, [])
+        num_columns = len(column_names)
+        sanitize_row = _build_row_sanitizer(column_names, data_values_as_floats)
+
+        for row in reader:
+            # Skip blank rows, like `csv.DictReader` does.
+            if not row:
+                continue
+
+            # Handle the (rare) row whose length differs from that of the first row.
+            #
+            # Note: I sanitize the values in place (instead of building a second dictionary),
+            #       which is safe since doing so does not change the dictionary's size.
+            #
+            if len(row) != num_columns:
+                row_dict = _build_ragged_row_dict(column_names, row)
+                for column_name, value in row_dict.items():
+                    if column_name in METADATA_COLUMN_NAMES:
+                        row_dict[column_name] = sanitize_metadata_value(value)
+                    else:
+                        sanitized_value = sanitize_data_value(value)
+                        if data_values_as_floats and sanitized_value is not None:
+                            number = float(sanitized_value)
+                            row_dict[column_name] = number if isfinite(number) else None
+                        else:
+                            row_dict[column_name] = sanitized_value
+                yield row_dict
+                continue
+
+            # Build a "sanitized" dictionary based upon this row, via the function built above.
+            yield sanitize_row(row)
+
+
+def parse_csv_file(
+    file_path: Path, data_values_as_floats: bool = False
+) -> List[RowDict]:
     """
     Parses the specified CSV file into a list of sanitary dictionaries.
 
     :param file_path: Absolute path to CSV file
+    :param data_values_as_floats: Whether to convert (valid) data values into floats
     :return: List of dictionaries, each of which represents a row of data
     """
-    sanitary_rows = []
+    return list(_iter_sanitary_rows(file_path, data_values_as_floats))
+
 
-    with open(file_path, newline="") as f:
-        # Parse each row of the CSV file (except the first row) into a dictionary,
-        # using the column names from the first row as the dictionary's keys.
-        dict_reader: Iterable[RowDict] = csv.DictReader(f)
-        for row_dict in dict_reader:
-            # Build a "sanitized" dictionary based upon this row.
-            sanitary_row = {}
-            for column_name, value in row_dict.items():
-                if column_name in METADATA_COLUMN_NAMES:
-                    sanitary_row[column_name] = sanitize_metadata_value(value)
-                else:
-                    sanitary_row[column_name] = sanitize_data_value(value)
-            sanitary_rows.append(sanitary_row)
+def parse_csv_file_in_batches(
+    file_path: Path, batch_size: int = BATCH_SIZE, data_values_as_floats: bool = False
+) -> Iterator[List[RowDict]]:
+    """
+    Parses the specified CSV file into lists of sanitary dictionaries, yielding one list at a time.
 
-    return sanitary_rows
+    :param file_path: Absolute path to CSV file
+    :param batch_size: Maximum number of dictionaries in each list
+    :param data_values_as_floats: Whether to convert (valid) data values into floats
+    :return: Iterator of lists of dictionaries, each of which represents a row of data
+    """
+    sanitary_rows = _iter_sanitary_rows(file_path, data_values_as_floats)
+    return _split_into_batches(sanitary_rows, batch_size)
 
 
-def store_samples_in_database(samples: List[dict]) -> List[Any]:
+def _get_default_client() -> MongoClient:
     """
-    Stores samples in the MongoDB database specified by environment variables.
+    Returns the MongoDB client specified by environment variables, creating it the first time this
+    function is called.
 
-    :param samples: List of dictionaries, each of which represents a sample
-    :return: List of the MongoDB `_id`s of the successfully stored samples
+    Note: A `MongoClient` manages a pool of connections (and a background thread that monitors the
+          database); so, I create one per process and reuse it, instead of creating one per use.
+          Reference: https://pymongo.readthedocs.io/en/stable/faq.html#how-does-connection-pooling-work-in-pymongo
+
+    :return: The client
     """
+    global _default_client
+    if _default_client is None:
+        _default_client = MongoClient(
+            username=env["MONGO_USERNAME"],
+            password=env["MONGO_PASSWORD"],
+            host=env["MONGO_HOST"],
+            port=int(env["MONGO_PORT"]),
+        )
+    return _default_client
+
+
+def _get_collection(client: Optional[MongoClient] = None) -> Collection:
+    """
+    Returns a handle to the MongoDB collection specified by environment variables, and ensures the
+    collection has the indexes this script relies upon.
 
-    # Insert the data into the database.
+    :param client: The MongoDB client you want to use (defaults to the one specified by
+                   environment variables)
+    :return: The collection
+    """
+    # Connect to the database.
     #
     # Note: If the specified database and/or collection don't already exist when they are used,
     #       they will be automatically created at that time.
     #       Reference: https://pymongo.readthedocs.io/en/stable/tutorial.html
     #
-    mongo_client: MongoClient = MongoClient(
-        username=env["MONGO_USERNAME"],
-        password=env["MONGO_PASSWORD"],
-        host=env["MONGO_HOST"],
-        port=int(env["MONGO_PORT"]),
-    )
+    mongo_client = client if client is not None else _get_default_client()
     db = mongo_client[env["MONGO_DATABASE_NAME"]]
-    collection = db[env["MONGO_COLLECTION_NAME"]]
+
+    # Note: The write concern, `w=1`, makes it so the database acknowledges each write.
+    #       Reference: https://www.mongodb.com/docs/manual/reference/write-concern/#w-option
+    collection = db.get_collection(
+        env["MONGO_COLLECTION_NAME"], write_concern=WriteConcern(w=1)
+    )
 
     # Create an index (with a "unique" constraint) of the "Sample_ID" values.
     #
@@ -123,31 +344,232 @@ def store_samples_in_database(samples: List[dict]) -> List[Any]:
     #
     collection.create_index([("Sample_ID", ASCENDING)], unique=True)
 
-    # Insert the samples into the collection.
+    return collection
+
+
+def _print_duplicate_sample_id_message(sample: dict) -> None:
+    """
+    Displays a message saying the specified sample was not stored in the database, because its
+    "Sample_ID" value is already in use.
+
+    :param sample: The sample
+    """
+    console.print(
+        f"[red]Failed[/red] to store sample in database (its Sample_ID is already in use): {sample}"
+    )
+
+
+def _insert_batch(collection: Collection, batch: List[dict]) -> List[Any]:
+    """
+    Inserts a batch of samples into the specified MongoDB collection.
+
+    :param collection: The collection into which you want to insert the samples
+    :param batch: Non-empty list of dictionaries, each of which represents a sample
+    :return: List of the MongoDB `_id`s of the successfully stored samples
+    """
+    # Insert the samples into the collection, in bulk.
+    #
+    # Note: An earlier version of this script inserted the samples one by one, so that it could
+    #       display an actionable error message about each sample it failed to store (when using
+    #       `collection.insert_many`, I had failed to find official documentation about which
+    #       samples had been stored). That approach cost one round trip to the database per sample.
     #
-    # Note: An earlier version of this script used the `collection.insert_many` function to insert
-    #       all samples into the collection in bulk. If any of those samples violated the "unique"
-    #       index in the collection, the function would raise a `pymongo.errors.BulkWriteError`
-    #       exception and the remaining samples would not be inserted. While that exception object
-    #       does contain a property named `nInserted` (which I suspect indicates the number of
-    #       records that were successfully inserted), I failed to find official documentation
-    #       about that property. So, I am hesitant to rely on it. However, I still want to be able
-    #       to display an actionable error message. For that reason, I updated this script to perform
-    #       the inserts one by one (trading performance for usability), relying only on features
-    #       about which I found official documentation.
+    #       This script now performs an "unordered" bulk insert, which makes it so the database
+    #       attempts to insert every sample—even after failing to insert one. When any inserts fail,
+    #       the function raises a `pymongo.errors.BulkWriteError` exception whose `details` property
+    #       contains a list named `writeErrors`, each element of which contains the index (within
+    #       the batch) of a sample the database failed to store. I use those indexes to
+    #       display the same error messages the per-sample approach displayed.
     #
     #       References:
+    #       - https://pymongo.readthedocs.io/en/stable/api/pymongo/collection.html#pymongo.collection.Collection.insert_many
     #       - https://pymongo.readthedocs.io/en/stable/api/pymongo/errors.html#pymongo.errors.BulkWriteError
-    #       - https://pymongo.readthedocs.io/en/stable/api/pymongo/results.html#pymongo.results.BulkWriteResult.inserted_count
-    #       - https://github.com/mongodb/mongo-python-driver/blob/065b02bcb3ff6d8c088e4934105b9158f48d7074/pymongo/bulk.py#L98
+    #       - https://www.mongodb.com/docs/manual/reference/command/insert/#output
+    #
+    # Note: The `insert_many` function adds an `_id` field to each sample that lacks one.
+    #
+    try:
+        result = collection.insert_many(batch, ordered=False)
+        return list(result.inserted_ids)
+    except errors.BulkWriteError as bwe:
+        failed_indexes = set()
+        for write_error in bwe.details["writeErrors"]:
+            failed_indexes.add(write_error["index"])
+            sample = batch[write_error["index"]]
+            if write_error["code"] == DUPLICATE_KEY_ERROR_CODE:
+                _print_duplicate_sample_id_message(sample)
+            else:
+                console.print(
+                    f"[red]Failed[/red] to store sample in database: {sample}"
+                )
+                # Display the reason the database gave for failing to store the sample.
+                # Note: I escape it so `rich` doesn't interpret any square brackets in it as markup.
+                # Reference: https://rich.readthedocs.io/en/stable/markup.html#escaping
+                console.print(f"  Reason: {escape(write_error['errmsg'])}")
+        return [
+            sample["_id"]
+            for idx, sample in enumerate(batch)
+            if idx not in failed_indexes
+        ]
+
+
+def _insert_batch_without_acknowledgement(
+    collection: Collection, known_sample_ids: Set[Any], batch: List[dict]
+) -> List[Any]:
+    """
+    Inserts a batch of samples into the specified MongoDB collection, without waiting for the
+    database to acknowledge the inserts.
+
+    Since the database won't report which inserts failed, this function skips (and displays an
+    error message about) each sample whose "Sample_ID" value is in the specified set; and adds the
+    "Sample_ID" values of the other samples to that set.
+
+    :param collection: The collection (having a write concern of `w=0`) into which you want to
+                       insert the samples
+    :param known_sample_ids: Set of "Sample_ID" values already present in the collection
+    :param batch: Non-empty list of dictionaries, each of which represents a sample
+    :return: List of the MongoDB `_id`s of the samples sent to the database
+    """
+    # Note: I use `dict.get` here, so that a sample lacking a "Sample_ID" field is treated as having
+    #       a `None` value, like the "unique" index treats it (i.e. as `null`).
+    #       Reference: https://www.mongodb.com/docs/manual/core/index-unique/#missing-document-field-in-a-unique-single-field-index
+    #
+    samples_to_send = []
+    for sample in batch:
+        sample_id = sample.get("Sample_ID")
+        if sample_id in known_sample_ids:
+            _print_duplicate_sample_id_message(sample)
+        else:
+            known_sample_ids.add(sample_id)
+            samples_to_send.append(sample)
+
+    if len(samples_to_send) == 0:
+        return []
+
+    result = collection.insert_many(samples_to_send, ordered=False)
+    return list(result.inserted_ids)
+
+
+def store_samples_in_database(
+    samples: Iterable[dict], client: Optional[MongoClient] = None
+) -> List[Any]:
+    """
+    Stores samples in the MongoDB database specified by environment variables.
+
+    :param samples: Iterable of dictionaries, each of which represents a sample (can be an
+                    iterator, which will be consumed one batch at a time)
+    :param client: The MongoDB client you want to use (defaults to the one specified by
+                   environment variables)
+    :return: List of the MongoDB `_id`s of the successfully stored samples
+    """
+
+    collection = _get_collection(client)
+
+    # Insert the samples into the collection, one batch at a time.
+    #
+    # Note: Inserting the samples in batches (instead of all at once) limits the size of each
+    #       message the driver sends to the database, and makes it so a failure to store one
+    #       batch doesn't prevent the other batches from being stored.
     #
     inserted_ids = []
-    for sample in samples:
+    for batch in _split_into_batches(samples, BATCH_SIZE):
+        inserted_ids.extend(_insert_batch(collection, batch))
+
+    return inserted_ids
+
+
+def store_sample_batches_in_database(
+    batches: Iterable[List[dict]],
+    fast_insert: bool = False,
+    client: Optional[MongoClient] = None,
+) -> List[Any]:
+    """
+    Stores batches of samples in the MongoDB database specified by environment variables.
+
+    The batches get stored by a separate thread, so that the caller can produce the next batch
+    (e.g. parse it from a CSV file) while the current one is being stored.
+
+    :param batches: Iterable of non-empty lists of dictionaries, each of which represents a sample
+    :param fast_insert: Whether to insert the samples without waiting for the database to
+                        acknowledge the inserts
+    :param client: The MongoDB client you want to use (defaults to the one specified by
+                   environment variables)
+    :return: List of the MongoDB `_id`s of the successfully stored samples (or, when
+             `fast_insert` is `True`, of the samples sent to the database)
+    """
+    collection = _get_collection(client)
+
+    # Decide how the storing thread will insert each batch.
+    #
+    # Note: When `fast_insert` is `True`, the inserts use a write concern of `w=0`, which makes it so
+    #       the database does not acknowledge them. That saves waiting for each batch to be written,
+    #       but it also means the database will not report which inserts failed (or whether any
+    #       did). In an attempt to compensate for that, I fetch all "Sample_ID" values already in
+    #       the collection up front, and skip any sample whose "Sample_ID" value would violate the
+    #       "unique" index.
+    #       Reference: https://www.mongodb.com/docs/manual/reference/write-concern/#w-option
+    #
+    # Note: I fetch those values via a cursor (instead of via `distinct`), since the database
+    #       returns the result of `distinct` as a single document, which cannot exceed 16 MB; a
+    #       cursor returns the values in batches instead. A document lacking a "Sample_ID" field
+    #       comes back as `{}`, which `dict.get` turns into `None` (like the "unique" index does).
+    #       Reference: https://www.mongodb.com/docs/manual/reference/command/distinct/#results
+    #
+    # Note: The index itself still gets created via the acknowledged collection handle (in
+    #       `_get_collection`), so that any problem creating it gets reported.
+    #
+    insert_batch: Callable[[List[dict]], List[Any]]
+    if fast_insert:
+        insert_batch = partial(
+            _insert_batch_without_acknowledgement,
+            collection.with_options(write_concern=WriteConcern(w=0)),
+            {
+                document.get("Sample_ID")
+                for document in collection.find({}, {"Sample_ID": True, "_id": False})
+            },
+        )
+    else:
+        insert_batch = partial(_insert_batch, collection)
+
+    # Hand the batches off to the "storing" thread via a queue, using `None` to indicate there
+    # are no more batches.
+    #
+    # Note: The queue's `maxsize` limits how many batches can be waiting to be stored at a time
+    #       (which, in turn, limits how much memory the waiting batches can use). When the queue is
+    #       full, `queue.put` waits until the storing thread takes a batch out of the queue.
+    #       Reference: https://docs.python.org/3/library/queue.html#queue.Queue
+    #
+    # Note: Using a thread (as opposed to a process) is sufficient here, since `pymongo` releases
+    #       the GIL while waiting for the database to respond.
+    #
+    queue: Queue[Optional[List[dict]]] = Queue(maxsize=MAX_QUEUED_BATCHES)
+    inserted_ids: List[Any] = []
+    exceptions: List[BaseException] = []
+
+    def store_queued_batches():
         try:
-            result = collection.insert_one(sample)
-            inserted_ids.append(result.inserted_id)
-        except errors.WriteError:
-            console.print(f"[red]Failed[/red] to store sample in database: {sample}")
+            while (batch := queue.get()) is not None:
+                inserted_ids.extend(insert_batch(batch))
+        except BaseException as e:
+            exceptions.append(e)
+            # Keep emptying the queue, so the producing thread doesn't wait forever to add a batch.
+            while queue.get() is not None:
+                pass
+
+    storing_thread = Thread(target=store_queued_batches)
+    storing_thread.start()
+    try:
+        for batch in batches:
+            if exceptions:
+                break
+            queue.put(batch)
+    finally:
+        queue.put(None)
+        storing_thread.join()
+
+    # Re-raise any exception that occurred in the storing thread, in this thread.
+    if exceptions:
+        raise exceptions[0]
 
     return inserted_ids
 
@@ -167,18 +589,48 @@ def main(
     is_debugging: bool = typer.Option(
         False, "--debug", "-d", help="Enable debug output."
     ),
+    is_storing_floats: bool = typer.Option(
+        False,
+        "--floats",
+        help="Store data values as numbers (instead of as strings).",
+    ),
+    is_fast_inserting: bool = typer.Option(
+        False,
+        "--fast-insert",
+        help="Do not wait for the database to acknowledge inserts (faster, but less reliable).",
+    ),
 ):
     """Extracts data from a CSV file and stores that data in a database."""
     if is_debugging:
         console.log(f"CSV file: {csv_file_path}")
 
-    samples = parse_csv_file(csv_file_path)
-    console.print(f"Extracted {len(samples)} samples from the CSV file.")
-    if is_debugging:
-        console.log(samples)
-
-    inserted_ids = store_samples_in_database(samples)
-    console.print(f"Stored {len(inserted_ids)} samples in the database.")
+    # Parse the CSV file and store the extracted samples in the database, concurrently.
+    #
+    # Note: This function counts (and, when debugging, logs) the batches as they pass from the
+    #       parser to the database; so, it never has to hold all the samples in memory at once.
+    #
+    num_samples = 0
+
+    def extract_batches() -> Iterator[List[RowDict]]:
+        nonlocal num_samples
+        for batch in parse_csv_file_in_batches(
+            csv_file_path, data_values_as_floats=is_storing_floats
+        ):
+            num_samples += len(batch)
+            if is_debugging:
+                console.log(batch)
+            yield batch
+
+    inserted_ids = store_sample_batches_in_database(
+        extract_batches(), fast_insert=is_fast_inserting
+    )
+    console.print(f"Extracted {num_samples} samples from the CSV file.")
+    if is_fast_inserting:
+        console.print(
+            f"Sent {len(inserted_ids)} samples to the database (without waiting for acknowledgement)."
+        )
+    else:
+        console.print(f"Stored {len(inserted_ids)} samples in the database.")
     if is_debugging:
         console.log(inserted_ids)
 
@@ -1,14 +1,18 @@
 from os import environ as env
-from tempfile import NamedTemporaryFile
 from pathlib import Path
+import time
 from typing import List, Iterator
 from pymongo import MongoClient
+from pymongo.collection import Collection
 import pymongo.errors
 import pytest
+from . import parser as parser_module
 from .parser import (
     parse_csv_file,
+    parse_csv_file_in_batches,
     sanitize_data_value,
     sanitize_metadata_value,
+    store_sample_batches_in_database,
     store_samples_in_database,
 )
 
@@ -52,88 +56,94 @@ def example_samples() -> List[dict]:
     return samples
 
 
-@pytest.fixture
-def db_client(monkeypatch: pytest.MonkeyPatch) -> Iterator[MongoClient]:
+@pytest.fixture(scope="session")
+def db_client() -> Iterator[MongoClient]:
     """
-    Patches the database name environment variable to refer to a test database.
-    Yields a MongoDB client.
-    Deletes the test database after the dependent test ends.
+    Patches the database name environment variable to refer to a test database, for the whole
+    test session.
+    Yields a MongoDB client, which all tests in the session share.
+    Deletes the test database after the last test of the session ends.
     """
     # Patch a specific environment variable so both the test and the app-under-test use a temporary database.
-    # Reference: https://docs.pytest.org/en/stable/how-to/monkeypatch.html#monkeypatching-environment-variables
+    #
+    # Note: The `monkeypatch` fixture can only be used by function-scoped fixtures; so, here, I use
+    #       `MonkeyPatch.context`, which undoes the patch when the `with` block ends.
+    #       Reference: https://docs.pytest.org/en/stable/reference/reference.html#pytest.MonkeyPatch.context
+    #
     db_name = "_test"
-    monkeypatch.setenv("MONGO_DATABASE_NAME", db_name)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MONGO_DATABASE_NAME", db_name)
 
-    mongo_client: MongoClient = MongoClient(
-        username=env["MONGO_USERNAME"],
-        password=env["MONGO_PASSWORD"],
-        host=env["MONGO_HOST"],
-        port=int(env["MONGO_PORT"]),
-    )
+        mongo_client: MongoClient = MongoClient(
+            username=env["MONGO_USERNAME"],
+            password=env["MONGO_PASSWORD"],
+            host=env["MONGO_HOST"],
+            port=int(env["MONGO_PORT"]),
+        )
 
-    yield mongo_client
+        yield mongo_client
 
-    # Delete the database.
-    mongo_client.drop_database(db_name)
+        # Delete the database.
+        mongo_client.drop_database(db_name)
+        mongo_client.close()
 
 
 @pytest.fixture
-def temp_file_path() -> Iterator[Path]:
+def collection(db_client: MongoClient) -> Iterator[Collection]:
     """
-    Creates a closed, empty, temporary file.
-    Yields the path to the file.
-    Deletes the file after the dependent test ends.
+    Yields a handle to the test collection.
+    Empties the collection (and deletes its indexes) after the dependent test ends.
+
+    Note: That is faster than deleting the whole database after each test.
     """
-    # Create a temporary file that does not automatically get deleted when closed.
-    # Reference: https://docs.python.org/3/library/tempfile.html#tempfile.NamedTemporaryFile
-    file = NamedTemporaryFile(delete=False)
-    file.close()
-    file_path = Path(file.name)
+    collection = db_client[env["MONGO_DATABASE_NAME"]][env["MONGO_COLLECTION_NAME"]]
 
-    yield file_path
+    yield collection
 
-    # Delete the file.
-    Path.unlink(file_path)
+    collection.delete_many({})
+    collection.drop_indexes()
 
 
 class TestParseCsvFile:
-    def test_it_preserves_column_names_verbatim(self, temp_file_path: Path):
+    def test_it_preserves_column_names_verbatim(self, tmp_path: Path):
+        csv_file_path = tmp_path / "samples.csv"
+
         # Populate the CSV file.
-        with open(temp_file_path, "w") as f:
-            print("""AAA, 12-3 4. ,ccc\n1,2,3""", file=f)
+        csv_file_path.write_text("""AAA, 12-3 4. ,ccc\n1,2,3\n""")
 
         # Parse it into samples and compare to expectation.
-        samples = parse_csv_file(temp_file_path)
+        samples = parse_csv_file(csv_file_path)
         assert samples[0] == {
             "AAA": "1",
             " 12-3 4. ": "2",
             "ccc": "3",
         }
 
-    def test_it_sanitizes_metadata_values(self, temp_file_path: Path):
+    def test_it_sanitizes_metadata_values(self, tmp_path: Path):
+        csv_file_path = tmp_path / "samples.csv"
+
         # Populate the CSV file.
-        with open(temp_file_path, "w") as f:
-            print("""Study_Code,Sample_ID,C\naaa, 12-3 4. ,3""", file=f)
+        csv_file_path.write_text("""Study_Code,Sample_ID,C\naaa, 12-3 4. ,3\n""")
 
         # Parse it into samples and compare to expectation.
-        samples = parse_csv_file(temp_file_path)
+        samples = parse_csv_file(csv_file_path)
         assert samples[0] == {
             "Study_Code": "aaa",  # no change
             "Sample_ID": "12-3 4.",  # stripped leading/trailing whitespace
             "C": "3",
         }
 
-    def test_it_sanitizes_data_values(self, temp_file_path: Path):
+    def test_it_sanitizes_data_values(self, tmp_path: Path):
+        csv_file_path = tmp_path / "samples.csv"
+
         # Populate the CSV file.
-        with open(temp_file_path, "w") as f:
-            print(
-                """Study_Code,Sample_ID,C,D,E,F,G,H,I,J\n"""
-                + """x,y,0,0.1,1,1.,1e2,z,-0.1,-9999""",
-                file=f,
-            )
+        csv_file_path.write_text(
+            """Study_Code,Sample_ID,C,D,E,F,G,H,I,J\n"""
+            + """x,y,0,0.1,1,1.,1e2,z,-0.1,-9999\n"""
+        )
 
         # Parse it into samples and compare to expectation.
-        samples = parse_csv_file(temp_file_path)
+        samples = parse_csv_file(csv_file_path)
         assert samples[0] == {
             "Study_Code": "x",  # (metadata value)
             "Sample_ID": "y",  # (metadata value)
@@ -147,21 +157,98 @@ class TestParseCsvFile:
             "J": None,  # raw value: "-9999"
         }
 
-    def test_it_parses_data_rows_into_samples(self, temp_file_path: Path):
+    def test_it_converts_data_values_into_floats_when_asked(self, tmp_path: Path):
+        csv_file_path = tmp_path / "samples.csv"
+
         # Populate the CSV file.
-        with open(temp_file_path, "w") as f:
-            print(
-                """Study_Code,Sample_ID,Percent_Fine_Sand,Percent_Med_Sand,"""
-                + """Percent_Coarse_Sand,Percent_Tot_Sand,Percent_Clay,Percent_Silt\n"""
-                # ------------------------------------------------------------------- # end of headers
-                + """WHONDRS_S19S,S19S_0001_BULK-D,21.1,69.7,0.1,90.9,0,9.1\n"""
-                + """WHONDRS_S19S,S19S_0001_BULK-M,65.3,26,0.6,91.9,6.9,1.2\n"""
-                + """WHONDRS_S19S,S19S_0001_BULK-U,20.4,68.6,2.1,91.1,8.9,0""",
-                file=f,
-            )
+        csv_file_path.write_text(
+            """Study_Code,Sample_ID,C,D,E,F\n""" + """1,2, 0 ,1.,.5,-9999\n"""
+        )
 
         # Parse it into samples and compare to expectation.
-        samples = parse_csv_file(temp_file_path)
+        samples = parse_csv_file(csv_file_path, data_values_as_floats=True)
+        assert samples[0] == {
+            "Study_Code": "1",  # (metadata value)
+            "Sample_ID": "2",  # (metadata value)
+            "C": 0.0,
+            "D": 1.0,
+            "E": 0.5,
+            "F": None,  # raw value: "-9999"
+        }
+        assert type(samples[0]["C"]) is float
+
+    def test_it_treats_data_values_too_large_for_floats_as_invalid(
+        self, tmp_path: Path
+    ):
+        csv_file_path = tmp_path / "samples.csv"
+
+        # Populate the CSV file (whose second data row has too many values).
+        huge_str = "9" * 400
+        csv_file_path.write_text(
+            f"""Sample_ID,C,D\nx,{huge_str},1\ny,{huge_str},1,2\n"""
+        )
+
+        # Parse it into samples and compare to expectation.
+        # Note: `float` converts `huge_str` into `inf`, which is not a valid data value.
+        samples = parse_csv_file(csv_file_path, data_values_as_floats=True)
+        assert samples[0] == {"Sample_ID": "x", "C": None, "D": 1.0}
+        assert samples[1] == {"Sample_ID": "y", "C": None, "D": 1.0, None: None}
+
+    def test_it_handles_rows_having_too_few_or_too_many_values(self, tmp_path: Path):
+        csv_file_path = tmp_path / "samples.csv"
+
+        # Populate the CSV file.
+        csv_file_path.write_text("""Study_Code,Sample_ID,C\nx\n\ny,z,1,2\n""")
+
+        # Parse it into samples and compare to expectation.
+        # Note: The blank row gets skipped, like `csv.DictReader` would skip it.
+        samples = parse_csv_file(csv_file_path)
+        assert len(samples) == 2
+        assert samples[0] == {
+            "Study_Code": "x",
+            "Sample_ID": None,  # (missing value)
+            "C": None,  # (missing value)
+        }
+        assert samples[1] == {
+            "Study_Code": "y",
+            "Sample_ID": "z",
+            "C": "1",
+            None: None,  # (extra value)
+        }
+
+    def test_it_handles_column_names_containing_special_characters(
+        self, tmp_path: Path
+    ):
+        csv_file_path = tmp_path / "samples.csv"
+
+        # Populate the CSV file.
+        csv_file_path.write_text('Sample_ID,"Percent ""Clay""",C\'\\n},C\nx,1,2,3\n')
+
+        # Parse it into samples and compare to expectation.
+        samples = parse_csv_file(csv_file_path)
+        assert len(samples) == 1
+        assert samples[0] == {
+            "Sample_ID": "x",
+            'Percent "Clay"': "1",
+            "C'\\n}": "2",
+            "C": "3",
+        }
+
+    def test_it_parses_data_rows_into_samples(self, tmp_path: Path):
+        csv_file_path = tmp_path / "samples.csv"
+
+        # Populate the CSV file.
+        csv_file_path.write_text(
+            """Study_Code,Sample_ID,Percent_Fine_Sand,Percent_Med_Sand,"""
+            + """Percent_Coarse_Sand,Percent_Tot_Sand,Percent_Clay,Percent_Silt\n"""
+            # ------------------------------------------------------------------- # end of headers
+            + """WHONDRS_S19S,S19S_0001_BULK-D,21.1,69.7,0.1,90.9,0,9.1\n"""
+            + """WHONDRS_S19S,S19S_0001_BULK-M,65.3,26,0.6,91.9,6.9,1.2\n"""
+            + """WHONDRS_S19S,S19S_0001_BULK-U,20.4,68.6,2.1,91.1,8.9,0\n"""
+        )
+
+        # Parse it into samples and compare to expectation.
+        samples = parse_csv_file(csv_file_path)
         assert len(samples) == 3
         assert samples[0] == {
             "Study_Code": "WHONDRS_S19S",
@@ -195,6 +282,30 @@ class TestParseCsvFile:
         }
 
 
+class TestParseCsvFileInBatches:
+    def test_it_yields_batches_of_samples(self, tmp_path: Path):
+        csv_file_path = tmp_path / "samples.csv"
+
+        # Populate the CSV file.
+        csv_file_path.write_text("""Sample_ID,C\na,1\nb,2\nc,3\n""")
+
+        # Parse it into batches of samples and compare to expectation.
+        batches = list(parse_csv_file_in_batches(csv_file_path, batch_size=2))
+        assert batches == [
+            [{"Sample_ID": "a", "C": "1"}, {"Sample_ID": "b", "C": "2"}],
+            [{"Sample_ID": "c", "C": "3"}],
+        ]
+
+    def test_it_yields_nothing_when_there_are_no_data_rows(self, tmp_path: Path):
+        csv_file_path = tmp_path / "samples.csv"
+
+        # Populate the CSV file.
+        csv_file_path.write_text("""Sample_ID,C\n""")
+
+        # Parse it into batches of samples and compare to expectation.
+        assert list(parse_csv_file_in_batches(csv_file_path)) == []
+
+
 class TestSanitizeMetadataValue:
     def test_it_strips_surrounding_whitespace(self):
         assert sanitize_metadata_value(" Foo") == "Foo"
@@ -259,36 +370,167 @@ class TestSanitizeDataValue:
 
 class TestStoreSamplesInDatabase:
     def test_it_stores_samples_in_database(
-        self, db_client: pymongo.MongoClient, example_samples: List[dict]
+        self,
+        db_client: pymongo.MongoClient,
+        collection: Collection,
+        example_samples: List[dict],
     ):
         # Try to store all the example samples.
-        inserted_ids = store_samples_in_database(example_samples)
+        inserted_ids = store_samples_in_database(example_samples, client=db_client)
         assert len(inserted_ids) == len(example_samples)
 
         # Verify each of the example samples is in the collection.
-        db = db_client[env["MONGO_DATABASE_NAME"]]
-        collection = db[env["MONGO_COLLECTION_NAME"]]
         assert collection.count_documents({}) == len(example_samples)  # all
         for ex_sample in example_samples:
             db_sample = collection.find_one({"Sample_ID": ex_sample["Sample_ID"]})
             assert ex_sample == db_sample
 
     def test_it_resumes_after_failing_to_store_a_sample(
-        self, db_client: pymongo.MongoClient, example_samples: List[dict]
+        self,
+        db_client: pymongo.MongoClient,
+        collection: Collection,
+        example_samples: List[dict],
     ):
         # Make it so the first and second example sample have the same "Sample_ID" value.
         # Note: As a reminder, the MongoDB collection has a "unique" index of the values in that field.
         example_samples[1]["Sample_ID"] = example_samples[0]["Sample_ID"]
 
         # Try to store all the example samples.
-        inserted_ids = store_samples_in_database(example_samples)
+        inserted_ids = store_samples_in_database(example_samples, client=db_client)
         assert len(inserted_ids) == len(example_samples) - 1  # all but one
 
         # Verify all example samples—except the second one—are in the collection.
-        db = db_client[env["MONGO_DATABASE_NAME"]]
-        collection = db[env["MONGO_COLLECTION_NAME"]]
         assert collection.count_documents({}) == len(example_samples) - 1  # all but one
         for idx, ex_sample in enumerate(example_samples):
             if idx not in [1]:
                 db_sample = collection.find_one({"Sample_ID": ex_sample["Sample_ID"]})
                 assert ex_sample == db_sample
+
+    def test_it_stores_samples_in_batches(
+        self,
+        db_client: pymongo.MongoClient,
+        collection: Collection,
+        example_samples: List[dict],
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        # Make it so each batch contains at most two samples, and so the third example sample
+        # (i.e. the first sample in the second batch) has the same "Sample_ID" value as the first.
+        monkeypatch.setattr(parser_module, "BATCH_SIZE", 2)
+        example_samples[2]["Sample_ID"] = example_samples[0]["Sample_ID"]
+
+        # Try to store all the example samples.
+        inserted_ids = store_samples_in_database(example_samples, client=db_client)
+        assert inserted_ids == [example_samples[0]["_id"], example_samples[1]["_id"]]
+
+        # Verify all example samples—except the third one—are in the collection.
+        assert collection.count_documents({}) == len(example_samples) - 1  # all but one
+        for idx, ex_sample in enumerate(example_samples):
+            if idx not in [2]:
+                db_sample = collection.find_one({"Sample_ID": ex_sample["Sample_ID"]})
+                assert ex_sample == db_sample
+
+    def test_it_stores_samples_from_an_iterator(
+        self,
+        db_client: pymongo.MongoClient,
+        collection: Collection,
+        example_samples: List[dict],
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        # Make it so each batch contains at most two samples.
+        monkeypatch.setattr(parser_module, "BATCH_SIZE", 2)
+
+        # Try to store all the example samples, via an iterator (which has no length).
+        inserted_ids = store_samples_in_database(
+            iter(example_samples), client=db_client
+        )
+        assert inserted_ids == [ex_sample["_id"] for ex_sample in example_samples]
+        assert collection.count_documents({}) == len(example_samples)  # all
+
+
+def wait_for_document_count(
+    collection: Collection, expected_count: int, timeout_seconds: float = 5.0
+) -> None:
+    """
+    Waits until the specified collection contains the specified number of documents.
+
+    Tests that send unacknowledged (`w=0`) inserts use this to ensure the database has applied
+    those inserts before the test ends (so they don't leak into the next test, by being applied
+    after the `collection` fixture has emptied the collection).
+
+    :param collection: The collection
+    :param expected_count: The number of documents you expect the collection to contain
+    :param timeout_seconds: Maximum number of seconds to wait
+    """
+    deadline = time.monotonic() + timeout_seconds
+    while collection.count_documents({}) != expected_count:
+        assert (
+            time.monotonic() < deadline
+        ), "Timed out waiting for unacknowledged inserts"
+        time.sleep(0.01)
+
+
+class TestStoreSampleBatchesInDatabase:
+    def test_it_stores_batches_of_samples_in_database(
+        self,
+        db_client: pymongo.MongoClient,
+        collection: Collection,
+        example_samples: List[dict],
+    ):
+        # Make it so the third example sample has the same "Sample_ID" value as the first.
+        example_samples[2]["Sample_ID"] = example_samples[0]["Sample_ID"]
+
+        # Try to store all the example samples, in two batches.
+        batches = [example_samples[:2], example_samples[2:]]
+        inserted_ids = store_sample_batches_in_database(iter(batches), client=db_client)
+        assert inserted_ids == [example_samples[0]["_id"], example_samples[1]["_id"]]
+
+        # Verify all example samples—except the third one—are in the collection.
+        assert collection.count_documents({}) == len(example_samples) - 1  # all but one
+        for idx, ex_sample in enumerate(example_samples):
+            if idx not in [2]:
+                db_sample = collection.find_one({"Sample_ID": ex_sample["Sample_ID"]})
+                assert ex_sample == db_sample
+
+    def test_it_skips_samples_having_known_sample_ids_when_fast_inserting(
+        self,
+        db_client: pymongo.MongoClient,
+        collection: Collection,
+        example_samples: List[dict],
+    ):
+        # Store the first example sample; then, make it so the third example sample has the same
+        # "Sample_ID" value as the second one.
+        store_samples_in_database(example_samples[:1], client=db_client)
+        example_samples[2]["Sample_ID"] = example_samples[1]["Sample_ID"]
+
+        # Try to store all the example samples (including the first one, again).
+        # Note: Since the inserts are not acknowledged, I only verify which samples were sent.
+        inserted_ids = store_sample_batches_in_database(
+            iter([example_samples]), fast_insert=True, client=db_client
+        )
+        assert inserted_ids == [example_samples[1]["_id"]]
+
+        # Wait for the database to apply the unacknowledged insert (of the second example sample).
+        wait_for_document_count(collection, 2)
+
+    def test_it_fast_inserts_samples_lacking_a_sample_id(
+        self,
+        db_client: pymongo.MongoClient,
+        collection: Collection,
+        tmp_path: Path,
+    ):
+        csv_file_path = tmp_path / "samples.csv"
+
+        # Populate the CSV file (which has no "Sample_ID" column).
+        csv_file_path.write_text("""AAA,BBB\n1,2\n3,4\n""")
+
+        # Try to store its samples.
+        # Note: The "unique" index treats a missing "Sample_ID" field as `null`; so, only the first
+        #       sample gets sent, like only the first one would get stored without `fast_insert`.
+        batches = parse_csv_file_in_batches(csv_file_path)
+        inserted_ids = store_sample_batches_in_database(
+            batches, fast_insert=True, client=db_client
+        )
+        assert len(inserted_ids) == 1
+
+        # Wait for the database to apply the unacknowledged insert (of the first sample).
+        wait_for_document_count(collection, 1)
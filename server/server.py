@@ -1,7 +1,9 @@
 from os import environ as env
 from typing import Annotated
+from urllib.parse import quote
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Path
+from bson import json_util
+from fastapi import FastAPI, HTTPException, Path, Response
 from fastapi.responses import RedirectResponse
 from fastapi.openapi.utils import get_openapi
 from pymongo import MongoClient
@@ -13,6 +15,27 @@ app = FastAPI()
 # Reference: https://github.com/theskumar/python-dotenv#getting-started
 load_dotenv(verbose=True)
 
+# Create a MongoDB client, which all requests will share.
+#
+# Note: A `MongoClient` manages a pool of connections to the database; so, creating one per request
+#       would make each request wait for a new connection to be established (and authenticated).
+#       Creating the client doesn't wait for a connection to be established, either; the client
+#       establishes connections as they are needed.
+#       Reference: https://pymongo.readthedocs.io/en/stable/faq.html#how-does-connection-pooling-work-in-pymongo
+#
+mongo_client: MongoClient = MongoClient(
+    username=env["MONGO_USERNAME"],
+    password=env["MONGO_PASSWORD"],
+    host=env["MONGO_HOST"],
+    port=int(env["MONGO_PORT"]),
+)
+
+
+@app.on_event("shutdown")
+def close_mongo_client():
+    """Closes the MongoDB client (and, in turn, its connections to the database)."""
+    mongo_client.close()
+
 
 @app.get("/", include_in_schema=False)
 def redirect_to_docs():
@@ -23,7 +46,16 @@ def redirect_to_docs():
 @app.get("/sampleid/{sample_id}", include_in_schema=False)
 def redirect_to_samples(sample_id: str):
     """Redirects the client to the "samples" endpoint."""
-    return RedirectResponse(f"/samples/{sample_id}")
+    # Note: I build the redirect response myself (instead of using `RedirectResponse`), since all
+    #       it needs is a status code and a `Location` header. I percent-encode the `Sample_ID` (like
+    #       `RedirectResponse` does) so that the header contains a valid URL.
+    #       References:
+    #       - https://developer.mozilla.org/en-US/docs/Web/HTTP/Status/307
+    #       - https://docs.python.org/3/library/urllib.parse.html#urllib.parse.quote
+    #
+    return Response(
+        status_code=307, headers={"Location": f"/samples/{quote(sample_id, safe='')}"}
+    )
 
 
 @app.get(
@@ -32,68 +64,72 @@ def redirect_to_samples(sample_id: str):
     tags=["samples"],
     summary="Get a sample",
     response_description="The sample having the specified `Sample_ID`",
+    # Note: The function returns a `Response` (see below); this tells FastAPI what it contains.
+    response_model=dict,
 )
 def get_sample(
     # Note: The `description` kwarg influences the OpenAPI schema/Swagger UI.
     sample_id: Annotated[
         str, Path(description="The `Sample_ID` of the sample you want to get")
     ]
-) -> dict:
+) -> Response:
     """Gets the sample having the specified `Sample_ID`."""
 
     # Fetch the specified sample from the MongoDB database.
     # Reference: https://pymongo.readthedocs.io/en/stable/tutorial.html#getting-a-single-document-with-find-one
-    mongo_client: MongoClient = MongoClient(
-        username=env["MONGO_USERNAME"],
-        password=env["MONGO_PASSWORD"],
-        host=env["MONGO_HOST"],
-        port=int(env["MONGO_PORT"]),
-    )
     db = mongo_client[env["MONGO_DATABASE_NAME"]]
     collection = db[env["MONGO_COLLECTION_NAME"]]
-    sample_mapping = collection.find_one({"Sample_ID": sample_id})
+
+    # Note: The projection tells the database to omit the `_id` field from the result,
+    #       since (a) its value is not serializable to JSON (it's an `ObjectId`), and
+    #             (b) it is not present in the example in the exercise prompt.
+    #       Reference: https://pymongo.readthedocs.io/en/stable/api/pymongo/collection.html#pymongo.collection.Collection.find
+    #
+    sample = collection.find_one({"Sample_ID": sample_id}, projection={"_id": False})
 
     # Return the sample, or raise an exception if the sample was not found.
-    if sample_mapping is None:
+    if sample is None:
         raise HTTPException(
             status_code=404,
             detail=f"Failed to find a sample having Sample_ID: '{sample_id}'",
         )
     else:
-        # Return a version of the result that does not contain the `_id` field,
-        # since (a) its value is not serializable to JSON (it's an `ObjectId`), and
-        #       (b) it is not present in the example in the exercise prompt.
+        # Serialize the sample into JSON myself and return the result as-is.
         #
-        # Note: Since `find_one` returns a `Mapping` (not a `dict`) and PyCharm says
-        #       I cannot use `del` on a `Mapping`, I first convert the `Mapping`
-        #       into a `dict`; then, I use `del` on the `dict` and return the result.
+        # Note: When a path operation function returns a `Response`, FastAPI does not validate or
+        #       convert the return value before sending it to the client; which, for a document
+        #       that is already JSON-compatible, would be redundant work.
         #
-        sample = dict(sample_mapping)
-        del sample["_id"]
-        return sample
-
-
-def get_custom_openapi_schema():
-    """
-    Returns a custom OpenAPI schema.
-    Reference: https://fastapi.tiangolo.com/advanced/extending-openapi/#generate-the-openapi-schema
-    """
-    # If the app lacks a "cached" schema, create and cache one.
-    if not app.openapi_schema:
-        # Effectively "cache" the schema for future reference.
-        app.openapi_schema = get_openapi(
-            title="sediment-api",
-            version="0.1.0",
-            description="Sediment API",
-            routes=app.routes,
+        # Note: I pass the same `separators` and `ensure_ascii` values `JSONResponse` uses, so the
+        #       response body is byte-for-byte what it would be otherwise (e.g. "é" is sent as
+        #       UTF-8, instead of as the escape sequence "\u00e9").
+        #       References:
+        #       - https://fastapi.tiangolo.com/advanced/response-directly/
+        #       - https://pymongo.readthedocs.io/en/stable/api/bson/json_util.html
+        #
+        return Response(
+            content=json_util.dumps(sample, ensure_ascii=False, separators=(",", ":")),
+            media_type="application/json",
         )
-    return app.openapi_schema
 
 
-# Override the default OpenAPI schema with a custom one.
+# Generate a custom OpenAPI schema, now that all the routes have been defined.
+# Reference: https://fastapi.tiangolo.com/advanced/extending-openapi/#generate-the-openapi-schema
+#
+# Note: I generate the schema once, here (i.e. when the app starts), making it so that serving the
+#       schema doesn't involve checking whether it has been generated yet.
+#
+app.openapi_schema = get_openapi(
+    title="sediment-api",
+    version="0.1.0",
+    description="Sediment API",
+    routes=app.routes,
+)
+
+# Override the default OpenAPI schema with the custom one.
 #
 # Note: I use `setattr` to resolve a "method-assign" error that mypy reported when
 #       I was using the `app.openapi = fn` statement shown in the FastAPI docs.
 #       Reference: https://github.com/python/mypy/issues/2427#issuecomment-480263443
 #
-setattr(app, "openapi", get_custom_openapi_schema)
+setattr(app, "openapi", lambda: app.openapi_schema)
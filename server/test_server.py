@@ -10,56 +10,72 @@ from .server import app
 client = TestClient(app)
 
 
-@pytest.fixture(autouse=True)  # automatically "used" by each test
-def seeded_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[Database]:
+@pytest.fixture(
+    scope="module", autouse=True
+)  # automatically "used" by the tests in this module
+def seeded_db() -> Iterator[Database]:
     """
     Patches the database name environment variable to refer to a test database.
     Seeds the test database.
     Yields a handle to the seeded test database.
-    Deletes the test database after the dependent test ends.
+    Deletes the test database after the last test in this module ends.
+
+    Note: The tests in this module do not modify the database; so, I seed it once for all of them
+          (instead of once per test).
     """
     # Patch a specific environment variable so both the test and the app-under-test use a temporary database.
-    # Reference: https://docs.pytest.org/en/stable/how-to/monkeypatch.html#monkeypatching-environment-variables
+    #
+    # Note: The `monkeypatch` fixture can only be used by function-scoped fixtures; so, here, I use
+    #       `MonkeyPatch.context`, which undoes the patch when the `with` block ends.
+    #       Reference: https://docs.pytest.org/en/stable/reference/reference.html#pytest.MonkeyPatch.context
+    #
     db_name = "_test"
-    monkeypatch.setenv("MONGO_DATABASE_NAME", db_name)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MONGO_DATABASE_NAME", db_name)
 
-    # Seed the database.
-    mongo_client: MongoClient = MongoClient(
-        username=env["MONGO_USERNAME"],
-        password=env["MONGO_PASSWORD"],
-        host=env["MONGO_HOST"],
-        port=int(env["MONGO_PORT"]),
-    )
-    db = mongo_client[db_name]
-    collection = db[env["MONGO_COLLECTION_NAME"]]
-    collection.create_index([("Sample_ID", ASCENDING)], unique=True)
-    collection.insert_many(
-        [
-            {
-                "Study_Code": "some_study_code",
-                "Sample_ID": "sample_a",
-                "C": "11",
-                "D": "2.2",
-            },
-            {
-                "Study_Code": "some_study_code",
-                "Sample_ID": "sample_b",
-                "C": "22",
-                "D": "3.3",
-            },
-            {
-                "Study_Code": "some_study_code",
-                "Sample_ID": "sample_c",
-                "C": "33",
-                "D": "4.4",
-            },
-        ]
-    )
+        # Seed the database.
+        mongo_client: MongoClient = MongoClient(
+            username=env["MONGO_USERNAME"],
+            password=env["MONGO_PASSWORD"],
+            host=env["MONGO_HOST"],
+            port=int(env["MONGO_PORT"]),
+        )
+        db = mongo_client[db_name]
+        collection = db[env["MONGO_COLLECTION_NAME"]]
+        collection.create_index([("Sample_ID", ASCENDING)], unique=True)
+        # Note: The "unordered" insert lets the database insert the documents in any order. I don't
+        #       use a write concern of `w=0` here, since the tests need the documents to have been
+        #       inserted before they run.
+        #       Reference: https://pymongo.readthedocs.io/en/stable/api/pymongo/collection.html#pymongo.collection.Collection.insert_many
+        collection.insert_many(
+            [
+                {
+                    "Study_Code": "some_study_code",
+                    "Sample_ID": "sample_a",
+                    "C": "11",
+                    "D": "2.2",
+                },
+                {
+                    "Study_Code": "some_study_code",
+                    "Sample_ID": "sample_b",
+                    "C": "22",
+                    "D": "3.3",
+                },
+                {
+                    "Study_Code": "some_study_code",
+                    "Sample_ID": "sample_c",
+                    "C": "33",
+                    "D": "4.4",
+                },
+            ],
+            ordered=False,
+        )
 
-    yield db
+        yield db
 
-    # Delete the database.
-    mongo_client.drop_database(db_name)
+        # Delete the database.
+        mongo_client.drop_database(db_name)
+        mongo_client.close()
 
 
 class TestGetRoot:
@@ -75,6 +91,11 @@ class TestGetSampleID:
         assert res.status_code == 307
         assert res.headers["location"] == "/samples/some_sample_id"
 
+    def test_it_percent_encodes_the_sample_id(self):
+        res = client.get("/sampleid/some sample id", follow_redirects=False)
+        assert res.status_code == 307
+        assert res.headers["location"] == "/samples/some%20sample%20id"
+
 
 class TestGetSamples:
     def test_it_responds_with_the_specified_sample(self):
@@ -85,6 +106,7 @@ class TestGetSamples:
         assert json["Sample_ID"] == "sample_b"
         assert json["C"] == "22"
         assert json["D"] == "3.3"
+        assert "_id" not in json
 
     def test_it_responds_with_404_error_when_sample_is_not_found(self):
         res = client.get("/samples/sample_d")